@@ -12,10 +12,11 @@ from typing import (
     List, Dict, Tuple, Set,  # Generic types
     Optional, Union,          # Type combinations
     Any, TypeVar,            # Special types
-    Callable,                # Function types
+    Callable, Iterable,      # Function and iterable types
     Literal,                 # Exact values
     Protocol                 # Structural subtyping
 )
+from functools import singledispatch
 from pathlib import Path
 from datetime import datetime
 
@@ -76,6 +77,32 @@ def process_data(value: Union[int, str, List[int]]) -> str:
     else:
         return f"Got list of {len(value)} integers"
 
+
+# Production version: singledispatch picks the implementation with one
+# type -> function dict lookup instead of walking an isinstance() chain,
+# so adding more types doesn't make every call slower.
+@singledispatch
+def process_data_dispatch(value: Union[int, str, List[int]]) -> str:
+    """
+    Fallback for types with no registered implementation.
+    """
+    raise TypeError(f"Unsupported type: {type(value).__name__}")
+
+
+@process_data_dispatch.register
+def _(value: int) -> str:
+    return f"Got integer: {value}"
+
+
+@process_data_dispatch.register
+def _(value: str) -> str:
+    return f"Got string: {value}"
+
+
+@process_data_dispatch.register(list)
+def _(value: List[int]) -> str:
+    return f"Got list of {len(value)} integers"
+
 # ============================================================================
 # SECTION 4: Callable (Function Types)
 # ============================================================================
@@ -103,13 +130,16 @@ def double(x: int) -> int:
 T = TypeVar('T')  # Define a type variable
 
 
-def get_first(items: List[T]) -> Optional[T]:
+def get_first(items: Iterable[T]) -> Optional[T]:
     """
     Generic function: works with any type.
     If you pass List[str], it returns Optional[str]
     If you pass List[int], it returns Optional[int]
+
+    Taking Iterable[T] instead of List[T] means generators work too:
+    next(iter(...)) needs neither len() nor indexing.
     """
-    return items[0] if items else None
+    return next(iter(items), None)
 
 # ============================================================================
 # SECTION 6: Literal (Exact Values)
@@ -118,13 +148,18 @@ def get_first(items: List[T]) -> Optional[T]:
 
 UserRole = Literal["admin", "user", "guest"]
 
+# Roles allowed to pass check_permission(). A frozenset keeps the check a
+# single hash lookup however many roles are added, and being immutable it
+# is safe to share between threads.
+_PERMITTED: frozenset[UserRole] = frozenset({"admin"})
+
 
 def check_permission(role: UserRole) -> bool:
     """
     role can ONLY be "admin", "user", or "guest"
     IDE will autocomplete these exact values
     """
-    return role == "admin"
+    return role in _PERMITTED
 
 # ============================================================================
 # SECTION 7: Protocol (Structural Typing)
@@ -199,6 +234,9 @@ if __name__ == "__main__":
     print(process_data(42))
     print(process_data("hello"))
     print(process_data([1, 2, 3]))
+    print(process_data_dispatch(42))
+    print(process_data_dispatch("hello"))
+    print(process_data_dispatch([1, 2, 3]))
 
     # Test Callable
     result = execute_twice(double, 5)
@@ -3,23 +3,53 @@
 import os
 import logging
 import asyncio
-from pathlib import Path
+from contextlib import asynccontextmanager
+from typing import Optional, Tuple
+import orjson
 from pydantic import BaseModel
 
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
-VALID_EXTENSIONS = {".mcam", ".vnc"}
+# A tuple so the filter can use str.endswith(), which checks every suffix
+# in C without building a Path object per entry
+VALID_EXTENSIONS = (".mcam", ".vnc")
 
-app = FastAPI(title="SourceRevision", version="0.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Runs once at startup: compile the index template and fill the file
+    listing cache so the first requests don't pay for it.
+    """
+    templates.get_template("index.html")
+    try:
+        await run_in_threadpool(_scan_repo)
+    except FileNotFoundError:
+        pass  # get_files() reports the missing directory
+    yield
+
+
+# ORJSONResponse: every JSON route is serialized by orjson, not stdlib json
+app = FastAPI(title="SourceRevision", version="0.0.0", lifespan=lifespan,
+              default_response_class=ORJSONResponse)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-templates = Jinja2Templates(directory="templates")
+# auto_reload=False: compiled templates stay in Jinja's cache instead of
+# being re-checked on disk every render (restart to pick up edits)
+templates = Jinja2Templates(
+    directory="templates", auto_reload=False, cache_size=400)
 
 REPO_PATH = "repo"
 
+# (etag, serialized JSON body) from the last scan. The etag is built from
+# the repo dir's st_mtime_ns; adding, removing or renaming a file bumps it,
+# which invalidates the cache.
+_file_listing_cache: Optional[Tuple[str, bytes]] = None
+
 
 # configure logging
 logging.basicConfig(
@@ -34,25 +64,56 @@ async def read_root(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
 
-@app.get("/api/files")
-async def get_files():
-    logger.info("Fetching all files")
+def _scan_repo() -> Tuple[str, bytes]:
+    """
+    Blocking directory scan. get_files() runs this in a worker thread
+    so the event loop can keep serving other requests meanwhile.
+
+    Returns:
+        (etag, JSON body) of the file listing
+    """
+    global _file_listing_cache
+    # One stat() on the directory instead of a full scan when unchanged
+    etag = f'W/"{os.stat(REPO_PATH).st_mtime_ns}"'
+    if _file_listing_cache is not None and _file_listing_cache[0] == etag:
+        return _file_listing_cache
+
     files_to_return = []
-    try:
-        # Get a slit of all the items in the directory
-        repo_files = os.listdir(REPO_PATH)
-        for filename in repo_files:
+    # scandir yields DirEntry objects whose is_file() comes from the
+    # directory read itself, so no extra stat() per entry
+    with os.scandir(REPO_PATH) as entries:
+        for entry in entries:
             # For now, we'll assum every file is 'available'
             # We also filter to only show files we care about
-            if Path(filename).suffix in VALID_EXTENSIONS:
-                files_to_return.append(
-                    {"name": filename, "status": "available"})
+            if not entry.name.endswith(VALID_EXTENSIONS):
+                continue
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            files_to_return.append(
+                {"name": entry.name, "status": "available"})
+
+    # Serialize once per change instead of once per request
+    _file_listing_cache = (etag, orjson.dumps(files_to_return))
+    return _file_listing_cache
+
+
+@app.get("/api/files")
+async def get_files(request: Request):
+    # Per-request noise, only useful when debugging
+    logger.debug("Fetching all files")
+    try:
+        etag, body = await run_in_threadpool(_scan_repo)
     except FileNotFoundError:
         print(f"ERROR: The repository directory '{REPO_PATH}' was not found.")
         # Retrun an empty list if the directory doesn't exist
         return []
 
-    return files_to_return
+    # Client already has this listing
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    return Response(content=body, media_type="application/json",
+                    headers={"ETag": etag})
 
 
 @app.get("/api/files/{filename}")
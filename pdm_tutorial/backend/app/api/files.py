@@ -7,6 +7,7 @@ Business logic will go in services/ (Stage 3)
 
 
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from app.schemas.files import FileInfo, FileListResponse
 from typing import List
 
@@ -33,18 +34,25 @@ MOCK_FILES = [
 
 # SECTION 3: GET endpoints
 # ========================
+# Responses are built from trusted in-process data. Returning a Response
+# directly skips FastAPI's response_model validation (the model is still
+# used for the docs) and orjson serializes the FileInfo dataclasses natively.
+# Untrusted request bodies are still validated.
 
 
 @router.get("/", response_model=FileListResponse)
 def get_files():
-    return FileListResponse(files=MOCK_FILES, total=len(MOCK_FILES))
+    return ORJSONResponse({
+        "files": [FileInfo(**file) for file in MOCK_FILES],
+        "total": len(MOCK_FILES)
+    })
 
 
 @router.get("/{filename}", response_model=FileInfo)
 def get_file(filename: str):
     for file in MOCK_FILES:
         if file["name"] == filename:
-            return FileInfo(**file)
+            return ORJSONResponse(FileInfo(**file))
 
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -2,6 +2,7 @@
 Application configuration.
 Centralized settings loaded from environment variabels
 """
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 from pathlib import Path
 
@@ -22,4 +23,13 @@ class Settings(BaseSettings):
         env_file_encoding = "utf-8"
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Return the shared Settings instance.
+
+    Settings() reads .env on every instantiation, so build it once.
+    Use with Depends(get_settings) in routes; tests can call
+    get_settings.cache_clear() to pick up changed environment variables.
+    """
+    return Settings()
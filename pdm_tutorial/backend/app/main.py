@@ -4,14 +4,29 @@ Main FastAPI application entry point
 This file should be thin - just app initialization and router inclusion
 Business logic goes in services/, routes go in api/.
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from app.config import settings
+from fastapi.responses import FileResponse, ORJSONResponse
+from app.config import get_settings
 from app.api import files
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Startup/shutdown hooks (replaces the deprecated @app.on_event)
+
+    Code before the yield runs once at process start, so one-time
+    initialization happens here rather than on the first request.
+    """
+    settings = get_settings()
+    print(f"Starting {settings.NAME} v{settings.VERSION}")
+    yield
+    print("Shutting down gracefully")
+
+
 def create_application() -> FastAPI:
     """
     Application factory pattern
@@ -20,9 +35,14 @@ def create_application() -> FastAPI:
     - Can create multilpe app instances (useful for testing)
     - Configuration centralized
     - Easy to add startup/shutdown logic
+
+    ORJSONResponse is the default response class so JSON responses are
+    serialized by orjson instead of the stdlib json module.
     """
+    settings = get_settings()
     app = FastAPI(title=settings.NAME, version=settings.VERSION, description="Parts Data Management System - A collaborative file locking system",
-                  debug=settings.DEBUG)
+                  debug=settings.DEBUG, default_response_class=ORJSONResponse,
+                  lifespan=lifespan)
 
     app.add_middleware(
         CORSMiddleware,
@@ -45,22 +65,6 @@ def create_application() -> FastAPI:
     async def serve_frontend():
         return FileResponse(settings.BASE_DIR / "static/index.html")
 
-    @app.on_event("startup")
-    async def startup_event():
-        print(f"Starting {settings.NAME} v{settings.VERSION}")
-
-    @app.on_event("shutdown")
-    async def shutdown_event():
-        print("Shutting down gracefully")
-
-    @app.get("/")
-    def read_root():
-        return {
-            "name": settings.NAME,
-            "version": settings.VERSION,
-            "status": "operational",
-            "message": "Welcome to the PMD Backend API"
-        }
     return app
 
 
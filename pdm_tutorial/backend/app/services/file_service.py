@@ -8,16 +8,44 @@ Hanles:
 """
 import os
 import json
+import sqlite3
+import threading
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional, Tuple
 from datetime import datetime, timezone
-import json
+from contextlib import contextmanager
+from dataclasses import dataclass
 import logging
 
 from app.utils.file_locking import LockedFile
 
-VALID_EXTENSIONS = {".mcam", ".vnc"}
+# orjson (C implementation) is several times faster than the json module.
+# Its JSONDecodeError subclasses json.JSONDecodeError, so one except covers both.
+try:
+    import orjson
+
+    # locks.json is written compact: only this code reads it, and indenting
+    # costs encoder time and bytes on every write. To inspect it by hand:
+    #   python -m json.tool locks.json
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj) -> bytes:
+        return (json.dumps(obj, separators=(',', ':')) + "\n").encode("utf-8")
+
+    _loads = json.loads
+
+# A tuple so list_files() can use str.endswith(), which checks every
+# suffix in one C call
+VALID_EXTENSIONS = (".mcam", ".vnc")
+
+# Locks files with these suffixes are stored with SQLiteLockManager
+SQLITE_SUFFIXES = {".db", ".sqlite", ".sqlite3"}
 
+# Log with %-style arguments, not f-strings: logging only formats the
+# message if the level is enabled
 logger = logging.getLogger(__name__)
 
 # Section 1 Lock management
@@ -27,37 +55,100 @@ class LockManager:
     """
     Manage file lock state
 
-    Stores locks in a JSON file with atomic read/write operations
+    Stores locks in a JSON file with atomic read/write operations.
+    The parsed file is cached and only re-read when its mtime or size
+    changes, so an unchanged file costs a single stat() per call. If it
+    was rewritten with identical bytes, the cached dict is reused without
+    parsing again.
+
+    Writes go to a temp file that is renamed over locks.json, so the file
+    is never seen half-written. Since the rename swaps the inode, access
+    is serialized through a sidecar locks.json.lock file instead of
+    locking locks.json itself.
+
+    Everything stays bytes: locks.json is read and written in binary and
+    handed straight to the JSON codec, with no str decode/encode between.
     """
 
     def __init__(self, locks_file: Path):
         self.locks_file = locks_file
+        self.lock_path = locks_file.with_name(locks_file.name + '.lock')
+        self.tmp_path = locks_file.with_name(locks_file.name + '.tmp')
+        # ((st_mtime_ns, st_size), raw bytes, locks) of the last load or save
+        self._locks_cache: Optional[
+            Tuple[Tuple[int, int], bytes, Dict[str, dict]]] = None
 
         # Ensure file exists
         if not self.locks_file.exists():
-            self.locks_file.write_text('{}')
+            self.locks_file.write_bytes(b'{}')
+        self.lock_path.touch(exist_ok=True)
+
+    @staticmethod
+    def _cache_key(st: os.stat_result) -> Tuple[int, int]:
+        # Size catches rewrites that land within the same mtime tick on
+        # filesystems with coarse timestamps
+        return (st.st_mtime_ns, st.st_size)
+
+    def _parse(self, content: bytes) -> Dict[str, dict]:
+        """
+        Parse locks.json, reusing the cached dict when the bytes match.
+
+        Comparing the bytes is a memcmp, much cheaper than parsing them
+        again, so touched-but-unchanged files skip the JSON decoder.
+        """
+        if self._locks_cache is not None and self._locks_cache[1] == content:
+            return self._locks_cache[2]
+        return _loads(content) if content else {}
+
+    def _write(self, data: bytes) -> Tuple[int, int]:
+        """
+        Atomically replace locks.json. Caller must hold the exclusive lock.
+
+        Returns:
+            Cache key of the new file
+        """
+        with open(self.tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(self.tmp_path, self.locks_file)
+        return self._cache_key(self.locks_file.stat())
 
     def load_locks(self) -> Dict[str, dict]:
         """
         Load current lock state.
 
         Returns:
-            Dict mapping filename to lock info
+            Dict mapping filename to lock info. This is a copy, so the
+            caller can change it without affecting the cache.
         """
-        if not self.locks_file.exists():
+        return dict(self._read_locks())
+
+    def _read_locks(self) -> Dict[str, dict]:
+        """Return the cached lock state itself. Callers must not change it."""
+        try:
+            key = self._cache_key(self.locks_file.stat())
+        except FileNotFoundError:
             return {}
 
+        # Cache hit: file unchanged since we last read or wrote it
+        if self._locks_cache is not None and self._locks_cache[0] == key:
+            return self._locks_cache[2]
+
         try:
-            with LockedFile(self.locks_file, 'r') as f:
-                content = f.read()
-                if not content.strip():
-                    return {}
-                return json.loads(content)
+            # Shared lock: keeps writers from replacing the file while it
+            # is open (Windows refuses to rename over an open file)
+            with LockedFile(self.lock_path, 'rb', shared=True):
+                key = self._cache_key(self.locks_file.stat())
+                content = self.locks_file.read_bytes()
+            locks = self._parse(content)
+            self._locks_cache = (key, content, locks)
+            return locks
         except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse locks file: {e}")
+            logger.error("Failed to parse locks file: %s", e)
             return {}
         except Exception as e:
-            logger.error(f"Faled to load locks: {e}")
+            logger.error("Faled to load locks: %s", e)
             return {}
 
     def save_locks(self, locks: dict):
@@ -68,21 +159,67 @@ class LockManager:
             locks: Dict mapping filename to lock info
         """
         try:
-            with LockedFile(self.locks_file, 'w') as f:
-                json.dump(locks, f, indent=2)
+            data = _dumps(locks)
+            with LockedFile(self.lock_path, 'r+b'):
+                key = self._write(data)
+            # Cache a copy so later edits to the caller's dict stay private
+            self._locks_cache = (key, data, dict(locks))
         except Exception as e:
-            logger.error(f"Failed to save locks: {e}")
+            # locks.json may or may not have been replaced, re-read it
+            self._locks_cache = None
+            logger.error("Failed to save locks: %s", e)
             raise
 
     def is_locked(self, filename: str) -> bool:
         """Checked if file is locked"""
-        locks = self.load_locks()
-        return filename in locks
+        return filename in self._read_locks()
 
     def get_lock_info(self, filename: str) -> Optional[dict]:
         """Get lock information for a file"""
-        locks = self.load_locks()
-        return locks.get(filename)
+        info = self._read_locks().get(filename)
+        return dict(info) if info is not None else None
+
+    @contextmanager
+    def transaction(self) -> Iterator[Dict[str, dict]]:
+        """
+        Read-modify-write the lock state under a single exclusive lock.
+
+        Usage:
+            with lock_manager.transaction() as locks:
+                locks[filename] = {...}
+
+        The dict is written back only if the block exits cleanly, so
+        raising inside it leaves locks.json untouched. Holding one lock
+        for the whole operation closes the race between a separate
+        load_locks() and save_locks().
+        """
+        with LockedFile(self.lock_path, 'r+b'):
+            # Always read the file here: a rewrite by another process can
+            # keep the same size and mtime tick, and trusting the stat key
+            # would write its changes away. _parse() still skips decoding
+            # when the bytes are unchanged.
+            content = self.locks_file.read_bytes()
+            try:
+                current = self._parse(content)
+            except json.JSONDecodeError as e:
+                logger.error("Failed to parse locks file: %s", e)
+                current = {}
+
+            # The block edits a copy: other threads read the cached dict
+            # without taking the lock, so editing it in place would show
+            # them locks that were never written
+            locks = dict(current)
+            yield locks
+
+            data = _dumps(locks)
+            try:
+                key = self._write(data)
+            except BaseException:
+                # locks.json may or may not have been replaced, re-read it
+                self._locks_cache = None
+                raise
+            # Publish only once the new file is in place
+            self._locks_cache = (key, data, locks)
 
     def acquire_lock(self, filename: str, user: str, message: str):
         """ 
@@ -91,22 +228,152 @@ class LockManager:
         Raises:
             ValueError: If file i already locked
         """
-        locks = self.load_locks()
+        with self.transaction() as locks:
+            if filename in locks:
+                existing = locks[filename]
+                raise ValueError(
+                    f"File already locked by {existing['user']}"
+                )
+            # Add lock
+            locks[filename] = {
+                'user': user,
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'message': message
+            }
+
+        logger.info("Lock acquired: %s by %s", filename, user)
 
-        if filename in locks:
-            existing = locks[filename]
-            raise ValueError(
-                f"File already locked by {existing['user']}"
+    def release_lock(self, filename: str, user: str):
+        """Release lock on a file.
+
+        Args:
+            filename: File to unlock
+            user: User releasing lock (must own lock)
+
+        Raises:
+            ValueError: If file not locked or wrong user
+        """
+        with self.transaction() as locks:
+            if filename not in locks:
+                raise ValueError("File is not locked")
+
+            if locks[filename]["user"] != user:
+                raise ValueError(
+                    f"Lock owned by {locks[filename]['user']}, not {user}"
+                )
+            # Remove lock
+            del locks[filename]
+
+        logger.info("Lock released: %s by %s", filename, user)
+
+
+class SQLiteLockManager:
+    """
+    Manage file lock state in a SQLite database (WAL mode)
+
+    Same interface as LockManager, for repos with a lot of checkout
+    traffic: acquire/release are single indexed INSERT/DELETE statements
+    instead of rewriting every lock, and WAL lets readers run alongside
+    the one writer. FileService picks it for a .db/.sqlite locks file.
+    """
+
+    def __init__(self, db_file: Path):
+        self.db_file = db_file
+        # One connection shared by the threadpool; sqlite3 wants callers
+        # to serialize access to it themselves
+        self._conn = sqlite3.connect(
+            db_file, isolation_level=None, check_same_thread=False)
+        self._conn_lock = threading.Lock()
+        with self._conn_lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS locks ("
+                "filename TEXT PRIMARY KEY, user TEXT NOT NULL, "
+                "timestamp TEXT NOT NULL, message TEXT NOT NULL)"
             )
-        # Add lock
-        locks[filename] = {
-            'user': user,
-            'timestamp': datetime.now(timezone.utc).isoformat(),
-            'message': message
+
+    def load_locks(self) -> Dict[str, dict]:
+        """
+        Load current lock state.
+
+        Returns:
+            Dict mapping filename to lock info
+        """
+        with self._conn_lock:
+            rows = self._conn.execute(
+                "SELECT filename, user, timestamp, message FROM locks"
+            ).fetchall()
+        return {
+            filename: {'user': user, 'timestamp': timestamp, 'message': message}
+            for filename, user, timestamp, message in rows
         }
 
-        self.save_locks(locks)
-        logger.info(f"Lock acquired: {filename} by {user}")
+    def save_locks(self, locks: dict):
+        """
+        Replace the whole lock state in one transaction.
+
+        Args:
+            locks: Dict mapping filename to lock info
+        """
+        with self._conn_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM locks")
+                self._conn.executemany(
+                    "INSERT INTO locks VALUES (?, ?, ?, ?)",
+                    [(filename, info['user'], info['timestamp'], info['message'])
+                     for filename, info in locks.items()]
+                )
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def export_json(self, path: Path):
+        """Write the lock state as a locks.json file for older tooling"""
+        path.write_bytes(_dumps(self.load_locks()))
+
+    def is_locked(self, filename: str) -> bool:
+        """Check if file is locked"""
+        return self.get_lock_info(filename) is not None
+
+    def get_lock_info(self, filename: str) -> Optional[dict]:
+        """Get lock information for a file"""
+        with self._conn_lock:
+            row = self._conn.execute(
+                "SELECT user, timestamp, message FROM locks WHERE filename = ?",
+                (filename,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'user': row[0], 'timestamp': row[1], 'message': row[2]}
+
+    def acquire_lock(self, filename: str, user: str, message: str):
+        """
+        Acquire lock on a file
+
+        Raises:
+            ValueError: If file is already locked
+            sqlite3.IntegrityError: If a column value is rejected
+        """
+        try:
+            with self._conn_lock:
+                self._conn.execute(
+                    "INSERT INTO locks VALUES (?, ?, ?, ?)",
+                    (filename, user, datetime.now(timezone.utc).isoformat(),
+                     message)
+                )
+        except sqlite3.IntegrityError:
+            # A primary key clash means the file is locked; anything else
+            # (e.g. a NULL message) is a real error
+            existing = self.get_lock_info(filename)
+            if existing is None:
+                raise
+            raise ValueError(
+                f"File already locked by {existing['user']}"
+            ) from None
+        logger.info("Lock acquired: %s by %s", filename, user)
 
     def release_lock(self, filename: str, user: str):
         """Release lock on a file.
@@ -118,47 +385,89 @@ class LockManager:
         Raises:
             ValueError: If file not locked or wrong user
         """
-        locks = self.load_locks()
-
-        if filename not in locks:
-            raise ValueError("File is not locked")
-
-        if locks[filename]["user"] != user:
+        with self._conn_lock:
+            deleted = self._conn.execute(
+                "DELETE FROM locks WHERE filename = ? AND user = ?",
+                (filename, user)
+            ).rowcount
+
+        if not deleted:
+            existing = self.get_lock_info(filename)
+            if existing is None:
+                raise ValueError("File is not locked")
             raise ValueError(
-                f"Lock owned by {locks[filename]['user']}, not {user}"
+                f"Lock owned by {existing['user']}, not {user}"
             )
-        # Remove lock
-        del locks[filename]
-        self.save_locks(locks)
-        logger.info(f"Lock released: {filename} by {user}")
+        logger.info("Lock released: %s by %s", filename, user)
 
 
 # SECTION 2 FILE REPO
 
+@dataclass(slots=True, frozen=True)
+class RepoFile:
+    """
+    A file in the repository directory, as returned by list_files()
+
+    Slotted so a big listing doesn't allocate a dict per file; frozen
+    because instances are shared through the listing cache.
+    """
+    name: str
+    size_bytes: int
+    modified: float
+
+
 class FileRepository:
     """
     Manage file operations on teh repositroy directory
+
+    list_files() is cached until the directory's mtime changes. That
+    catches adds, deletes and renames; in-place edits don't touch the
+    directory, so write_file() calls invalidate() itself.
     """
 
     def __init__(self, repo_path: Path):
         self.repo_path = repo_path
+        # A tuple, like RepoFile itself frozen, so no caller can edit it
+        self._listing_cache: Optional[Tuple[RepoFile, ...]] = None
+        self._listing_mtime = -1
 
         # Ensure repo directory exists
-        self.repo_path.mkdir(parents=True, exists_ok=True)
+        self.repo_path.mkdir(parents=True, exist_ok=True)
+
+    def invalidate(self):
+        """Drop the cached listing so the next list_files() rescans"""
+        self._listing_cache = None
+
+    def list_files(self) -> List[RepoFile]:
+        """
+        List repository files with a valid extension.
+
+        os.scandir() yields DirEntry objects that carry is_file() from the
+        directory read and cache stat(), so each file costs one stat at
+        most and no Path object is built per entry.
+
+        The name is checked first because it is free: on filesystems that
+        don't report the entry type (some NFS/SMB mounts) is_file() needs
+        its own stat, so non-matching entries never reach it.
+
+        Returns a new list each call; the cached listing is never handed out.
+        """
+        mtime = self.repo_path.stat().st_mtime_ns
+        if mtime == self._listing_mtime and self._listing_cache is not None:
+            return list(self._listing_cache)
 
-    def list_files(self, exension: str) -> List[Dict]:
         files = []
-        for item in self.repo_path.iterdir():
-            if not item.is_file():
-                continue
-            if not Path(item).suffix in VALID_EXTENSIONS:
-                continue
-            stat = item.stat()
-            files.append({
-                'name': item.name,
-                'size_bytes': stat.st_size,
-                'modified': stat.st_mitime,
-            })
+        with os.scandir(self.repo_path) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.endswith(VALID_EXTENSIONS):
+                    continue
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                stat = entry.stat(follow_symlinks=False)
+                files.append(RepoFile(name, stat.st_size, stat.st_mtime))
+        self._listing_cache = tuple(files)
+        self._listing_mtime = mtime
         return files
 
     def file_exists(self, filename: str) -> bool:
@@ -172,30 +481,38 @@ class FileRepository:
 
     def write_file(self, filename: str, content: bytes):
         self.get_file_path(filename).write_bytes(content)
+        self.invalidate()
 
 
 class FileService:
     def __init__(self, repo_path: Path, locks_file: Path):
         self.repository = FileRepository(repo_path)
-        self.lock_manager = LockManager(locks_file)
+        if locks_file.suffix in SQLITE_SUFFIXES:
+            self.lock_manager = SQLiteLockManager(locks_file)
+        else:
+            self.lock_manager = LockManager(locks_file)
 
     def get_files_with_status(self) -> List[Dict]:
         files = self.repository.list_files()
         locks = self.lock_manager.load_locks()
-        result = []
-        for file_info in files:
-            filename = file_info['name']
-            lock_info = locks.get(filename)
-            result.append({
-                'name': filename,
-                'size_bytes': file_info['size_bytes'],
-                'status': 'checked_out' if lock_info else 'available',
+        # Comprehension + local bind of locks.get keeps the per-file work
+        # in a tight loop. The walrus looks each lock up once; dict
+        # displays evaluate in order, so 'locked_by' sees it.
+        get_lock = locks.get
+        return [
+            {
+                'name': file_info.name,
+                'size_bytes': file_info.size_bytes,
+                'status': ('checked_out'
+                           if (lock_info := get_lock(file_info.name))
+                           else 'available'),
                 'locked_by': lock_info['user'] if lock_info else None,
-            })
-        return result
+            }
+            for file_info in files
+        ]
 
     def checkout_file(self, filename: str, user: str, message: str):
-        if not self.respository.file_exists(filename):
+        if not self.repository.file_exists(filename):
             raise ValueError(f"File not found: {filename}")
         self.lock_manager.acquire_lock(filename, user, message)
 
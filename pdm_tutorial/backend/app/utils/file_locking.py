@@ -6,11 +6,17 @@ Essential for preventing race conditions in concurrent environments
 """
 import os
 from pathlib import Path
-from typing import Union
+from typing import Optional, Union
 
 # Platform-specific imports
 if os.name == "nt":  # Windows
     import msvcrt
+    try:
+        # pywin32 (optional) provides shared locks, msvcrt only has exclusive
+        import pywintypes
+        import win32file
+    except ImportError:
+        win32file = None
 else:  # Unix-like (Linux, maxOS)
     import fcntl
 
@@ -18,7 +24,12 @@ else:  # Unix-like (Linux, maxOS)
 
 
 class LockedFile:
-    """Context manager for excluive file locking.
+    """Context manager for file locking.
+
+    Read-only modes ('r', 'rb') take a shared lock so concurrent readers
+    don't serialize; every other mode takes an exclusive lock. Pass
+    shared=True/False to override. On Windows shared locks need pywin32,
+    without it every lock is exclusive.
 
     Usage:
         with LockedFile(path, 'r+') as f:
@@ -35,16 +46,24 @@ class LockedFile:
     4. Other processes wait for lock before accessing
     """
 
-    def __init__(self, filepath: Union[str, Path], mode: str = 'r'):
+    def __init__(self, filepath: Union[str, Path], mode: str = 'r',
+                 shared: Optional[bool] = None):
         """
         Initialize locked file handler
         Args:
             filepath: Path to file
             mode: File open mode ('r', 'w', 'r+', etc.)
+            shared: Take a shared lock; defaults to True for read-only modes
             """
         self.filepath = Path(filepath)
         self.mode = mode
         self.file = None
+        # Readers only need to exclude writers, not each other
+        if shared is None:
+            shared = 'r' in mode and '+' not in mode
+        self.shared = shared
+        # Windows: number of bytes locked by msvcrt, None for a pywin32 lock
+        self._lock_len = None
 
     def __enter__(self):
         """ 
@@ -56,12 +75,27 @@ class LockedFile:
         # Open file
         self.file = open(self.filepath, self.mode)
 
-        # Acquire exclusive lock
-        if os.name == 'nt':
+        # Acquire lock
+        if os.name == 'nt' and self.shared and win32file is not None:
+            # Windows + pywin32: LockFileEx with no flags is a blocking
+            # shared lock over the whole file
+            try:
+                win32file.LockFileEx(
+                    win32file._get_osfhandle(self.file.fileno()),
+                    0, 0, -0x10000, pywintypes.OVERLAPPED()
+                )
+            except pywintypes.error as e:
+                self.file.close()
+                raise IOError(
+                    f"Could not acquire lock on {self.filepath}: {e}")
+        elif os.name == 'nt':
             # Windows: Lock a byte range
             # msvcrt.locking() locks a byte range
+            # It has no shared mode, so without pywin32 readers are
+            # exclusive here too
             # We lock from poistion 0 to EOF
-            file_size = os.path.getsize(self.filepath)
+            # fstat the open handle rather than resolving the path again
+            file_size = os.fstat(self.file.fileno()).st_size
             if file_size == 0:
                 file_size = 1  # Lock at least 1 byte
 
@@ -77,12 +111,16 @@ class LockedFile:
                 self.file.close()
                 raise IOError(
                     f"Could not acquire lock on {self.filepath}: {e}")
+            # Unlock exactly what was locked, even if the file grows
+            self._lock_len = file_size
         else:
             # Unix: flock() is simpler and more reliable
+            # LOCK_SH: Shared lock, many readers at once
             # LOCK_EX: Exclusive lock
             # Blocks until lock is available
+            operation = fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX
             try:
-                fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+                fcntl.flock(self.file.fileno(), operation)
             except IOError as e:
                 self.file.close()
                 raise IOError(
@@ -95,26 +133,40 @@ class LockedFile:
         Called even if exception occurs in the with block
         """
         if self.file:
-            # Release lock
-            if os.name == "nt":
-                try:
-                    file_size = os.path.getsize(self.filepath)
-                    if file_size == 0:
-                        file_size = 1
-                    msvcrt.locking(
-                        self.file.fileno(),
-                        msvcrt.LK_UNLCK,
-                        file_size
-                    )
-                except:
-                    pass
-            else:
-                try:
-                    fnctl.flock(self.file, fileno(), fcntl.LOCK_UN)
-                except:
-                    pass
-            # Close file
-            self.file.close()
+            try:
+                # Push buffered writes out while we still hold the lock,
+                # otherwise the next holder can read the file before
+                # they land
+                self.file.flush()
+            finally:
+                # Release lock
+                if os.name == "nt" and self._lock_len is None:
+                    try:
+                        win32file.UnlockFileEx(
+                            win32file._get_osfhandle(self.file.fileno()),
+                            0, -0x10000, pywintypes.OVERLAPPED()
+                        )
+                    except pywintypes.error:
+                        pass
+                elif os.name == "nt":
+                    try:
+                        # msvcrt locks from the current position, which the
+                        # with block has moved; go back to where we locked
+                        self.file.seek(0)
+                        msvcrt.locking(
+                            self.file.fileno(),
+                            msvcrt.LK_UNLCK,
+                            self._lock_len
+                        )
+                    except OSError:
+                        pass
+                else:
+                    try:
+                        fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+                    except OSError:
+                        pass
+                # Close file
+                self.file.close()
 
         # Propagate exceptions (return False)
         return False
@@ -133,13 +185,15 @@ if __name__ == "__main__":
     import time
 
     test_file = Path("lock_test.json")
-    test_file.write_text('{"counter": 0}')
+    THREADS = 3
+    INCREMENTS = 100
 
     def safe_increment(thread_id):
         """
-        Atomic increment using LockedFile
+        (a) Atomic increment using LockedFile, one lock per increment.
+        This is what LockManager pays on every checkout.
         """
-        for i in range(100):
+        for i in range(INCREMENTS):
             with LockedFile(test_file, "r+") as f:
                 # Read
                 data = json.load(f)
@@ -152,28 +206,43 @@ if __name__ == "__main__":
                 f.truncate()
                 json.dump(data, f)
 
-            # Small delay to increase chance of contention
-            time.sleep(0.001)
-
-    print("Testing file locking with multiple threads...")
-
-    # Run three threads simultaneously
-    threads = [
-        threading.Thread(target=safe_increment, args=(i,))
-        for i in range(3)
-    ]
-    for t in threads:
-        t.start()
-
-    for t in threads:
-        t.join()
+    def batched_increment(thread_id):
+        """
+        (b) Take the lock once and do every increment under that one hold
+        """
+        with LockedFile(test_file, "r+") as f:
+            data = json.load(f)
+            for i in range(INCREMENTS):
+                data['counter'] += 1
+            f.seek(0)
+            f.truncate()
+            json.dump(data, f)
 
-    # Vefiry corretness
-    final = json.loads(test_file.read_text())
-    expected = 300  # 3 threads x 100 increments
+    def run(worker):
+        """Run THREADS copies of worker, return (final counter, seconds)"""
+        test_file.write_text('{"counter": 0}')
+        threads = [
+            threading.Thread(target=worker, args=(i,))
+            for i in range(THREADS)
+        ]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        return json.loads(test_file.read_text())['counter'], elapsed
 
-    print(f"Expected: {expected}")
-    print(f"Got: {final['counter']}")
-    print(f"Success: {final['counter'] == expected}")
+    print("Testing file locking with multiple threads...")
+    expected = THREADS * INCREMENTS  # 3 threads x 100 increments
+
+    for label, worker in [("per-iteration lock", safe_increment),
+                          ("batched lock", batched_increment)]:
+        counter, elapsed = run(worker)
+        print(f"\n{label}:")
+        print(f"  Expected: {expected}")
+        print(f"  Got: {counter}")
+        print(f"  Success: {counter == expected}")
+        print(f"  {expected / elapsed:,.0f} ops/sec")
 
     test_file.unlink()
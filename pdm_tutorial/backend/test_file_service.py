@@ -0,0 +1,264 @@
+import json
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from app.services import file_service
+from app.services.file_service import (
+    FileRepository,
+    FileService,
+    LockManager,
+    SQLiteLockManager
+)
+
+
+def test_load_locks_empty(tmp_path):
+    """Test a fresh locks file loads as empty"""
+    manager = LockManager(tmp_path / "locks.json")
+    assert manager.load_locks() == {}
+
+
+def test_acquire_and_release_lock(tmp_path):
+    """Test a lock round-trips through the locks file"""
+    manager = LockManager(tmp_path / "locks.json")
+    manager.acquire_lock("1801811.mcam", "mmclean", "Editing file")
+    assert manager.is_locked("1801811.mcam")
+    assert manager.get_lock_info("1801811.mcam")["user"] == "mmclean"
+
+    manager.release_lock("1801811.mcam", "mmclean")
+    assert not manager.is_locked("1801811.mcam")
+
+
+def test_load_locks_sees_external_writes(tmp_path):
+    """Test the cache is invalidated when another process rewrites the file"""
+    locks_file = tmp_path / "locks.json"
+    manager = LockManager(locks_file)
+    assert manager.load_locks() == {}
+
+    locks_file.write_text(json.dumps(
+        {"4200536.mcam": {"user": "mmclean", "message": "Editing file"}}))
+    # Coarse filesystem timestamps can hide a quick rewrite, so force a bump
+    mtime_ns = locks_file.stat().st_mtime_ns + 1_000_000_000
+    os.utime(locks_file, ns=(mtime_ns, mtime_ns))
+
+    assert manager.is_locked("4200536.mcam")
+
+
+def test_failed_acquire_leaves_locks_untouched(tmp_path):
+    """Test raising inside the transaction does not write the file"""
+    manager = LockManager(tmp_path / "locks.json")
+    manager.acquire_lock("1801811.mcam", "mmclean", "Editing file")
+    before = (tmp_path / "locks.json").read_bytes()
+
+    with pytest.raises(ValueError):
+        manager.acquire_lock("1801811.mcam", "someone", "Also editing")
+
+    assert (tmp_path / "locks.json").read_bytes() == before
+    assert manager.get_lock_info("1801811.mcam")["user"] == "mmclean"
+
+
+def test_load_locks_sees_same_mtime_rewrite(tmp_path):
+    """Test a rewrite that keeps the old mtime is caught by the size change"""
+    locks_file = tmp_path / "locks.json"
+    manager = LockManager(locks_file)
+    assert manager.load_locks() == {}
+    st = locks_file.stat()
+
+    locks_file.write_text(json.dumps(
+        {"4200536.mcam": {"user": "mmclean", "message": "Editing file"}}))
+    os.utime(locks_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+    assert manager.is_locked("4200536.mcam")
+
+
+def test_list_files_filters_extensions(tmp_path):
+    """Test only regular files with a valid extension are listed"""
+    repo = FileRepository(tmp_path / "repo")
+    (repo.repo_path / "1801811.mcam").write_bytes(b"abc")
+    (repo.repo_path / "5604554.vnc").touch()
+    (repo.repo_path / "notes.txt").touch()
+    (repo.repo_path / "folder.mcam").mkdir()
+
+    files = {f.name: f for f in repo.list_files()}
+    assert sorted(files) == ["1801811.mcam", "5604554.vnc"]
+    assert files["1801811.mcam"].size_bytes == 3
+
+
+def test_concurrent_acquires_are_not_lost(tmp_path):
+    """Test parallel checkouts from separate managers all land in the file"""
+    locks_file = tmp_path / "locks.json"
+    LockManager(locks_file)
+
+    def checkout(i):
+        LockManager(locks_file).acquire_lock(f"{i}.mcam", "mmclean", "Editing")
+
+    threads = [threading.Thread(target=checkout, args=(i,)) for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(json.loads(locks_file.read_text())) == 20
+
+
+def test_failed_save_keeps_previous_file(tmp_path):
+    """Test a write that fails part way never replaces locks.json"""
+    locks_file = tmp_path / "locks.json"
+    manager = LockManager(locks_file)
+    manager.acquire_lock("1801811.mcam", "mmclean", "Editing file")
+    before = locks_file.read_bytes()
+
+    with pytest.raises(TypeError):
+        manager.save_locks({"1801811.mcam": object()})
+
+    assert locks_file.read_bytes() == before
+    assert manager.is_locked("1801811.mcam")
+
+
+def test_list_files_cache_invalidated_by_write(tmp_path):
+    """Test write_file refreshes sizes the directory mtime can't see"""
+    repo = FileRepository(tmp_path / "repo")
+    repo.write_file("1801811.mcam", b"abc")
+    assert repo.list_files()[0].size_bytes == 3
+
+    repo.write_file("1801811.mcam", b"abcdef")
+    assert repo.list_files()[0].size_bytes == 6
+
+
+def test_get_files_with_status(tmp_path):
+    """Test the listing is joined with the lock state"""
+    service = FileService(tmp_path / "repo", tmp_path / "locks.json")
+    service.repository.write_file("1801811.mcam", b"abc")
+    service.repository.write_file("4800124.mcam", b"")
+    service.checkout_file("1801811.mcam", "mmclean", "Editing file")
+
+    files = {f["name"]: f for f in service.get_files_with_status()}
+    assert files["1801811.mcam"] == {
+        "name": "1801811.mcam", "size_bytes": 3,
+        "status": "checked_out", "locked_by": "mmclean"}
+    assert files["4800124.mcam"]["status"] == "available"
+    assert files["4800124.mcam"]["locked_by"] is None
+
+
+def test_sqlite_lock_manager(tmp_path):
+    """Test the SQLite backend matches the JSON LockManager behaviour"""
+    manager = SQLiteLockManager(tmp_path / "locks.db")
+    manager.acquire_lock("1801811.mcam", "mmclean", "Editing file")
+    assert manager.is_locked("1801811.mcam")
+    assert manager.load_locks()["1801811.mcam"]["message"] == "Editing file"
+
+    with pytest.raises(ValueError, match="already locked by mmclean"):
+        manager.acquire_lock("1801811.mcam", "someone", "Also editing")
+    with pytest.raises(ValueError, match="owned by mmclean"):
+        manager.release_lock("1801811.mcam", "someone")
+
+    manager.export_json(tmp_path / "locks.json")
+    assert "1801811.mcam" in json.loads((tmp_path / "locks.json").read_text())
+
+    manager.release_lock("1801811.mcam", "mmclean")
+    assert manager.load_locks() == {}
+    with pytest.raises(ValueError, match="not locked"):
+        manager.release_lock("1801811.mcam", "mmclean")
+
+
+def test_file_service_picks_sqlite_for_db_suffix(tmp_path):
+    """Test a .db locks file selects the SQLite backend"""
+    service = FileService(tmp_path / "repo", tmp_path / "locks.db")
+    assert isinstance(service.lock_manager, SQLiteLockManager)
+
+
+def test_load_locks_reuses_dict_for_identical_rewrite(tmp_path, monkeypatch):
+    """Test a rewrite with the same bytes skips parsing"""
+    locks_file = tmp_path / "locks.json"
+    manager = LockManager(locks_file)
+    manager.acquire_lock("1801811.mcam", "mmclean", "Editing file")
+    locks = manager.load_locks()
+
+    locks_file.write_bytes(locks_file.read_bytes())
+    mtime_ns = locks_file.stat().st_mtime_ns + 1_000_000_000
+    os.utime(locks_file, ns=(mtime_ns, mtime_ns))
+
+    def fail(content):
+        raise AssertionError("locks.json was parsed again")
+
+    monkeypatch.setattr(file_service, "_loads", fail)
+    assert manager.load_locks() == locks
+
+
+def test_reader_during_failed_transaction_sees_committed_state(tmp_path):
+    """Test uncommitted edits are invisible to readers and discarded on failure"""
+    manager = LockManager(tmp_path / "locks.json")
+    assert manager.load_locks() == {}
+    seen = []
+
+    def read():
+        seen.append(dict(manager.load_locks()))
+
+    def failing_write(data):
+        raise OSError("disk full")
+
+    manager._write = failing_write
+    with pytest.raises(OSError):
+        with manager.transaction() as locks:
+            locks["1801811.mcam"] = {"user": "mmclean", "message": "Editing"}
+            reader = threading.Thread(target=read)
+            reader.start()
+            reader.join()
+
+    assert seen == [{}]
+    assert manager.load_locks() == {}
+    assert json.loads((tmp_path / "locks.json").read_text()) == {}
+
+
+def test_transaction_sees_same_size_same_mtime_rewrite(tmp_path):
+    """Test a rewrite hidden from the stat key is not written away"""
+    locks_file = tmp_path / "locks.json"
+    worker_a = LockManager(locks_file)
+    worker_b = LockManager(locks_file)
+    worker_a.acquire_lock("a.mcam", "u1", "Editing")
+    st = locks_file.stat()
+
+    # Worker B hands a.mcam to u2: same size, same mtime tick
+    worker_b.release_lock("a.mcam", "u1")
+    worker_b.acquire_lock("a.mcam", "u2", "Editing")
+    assert locks_file.stat().st_size == st.st_size
+    os.utime(locks_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+    worker_a.acquire_lock("c.mcam", "u3", "Editing")
+
+    locks = json.loads(locks_file.read_text())
+    assert locks["a.mcam"]["user"] == "u2"
+    assert locks["c.mcam"]["user"] == "u3"
+
+
+def test_load_and_save_locks_do_not_share_the_cache(tmp_path):
+    """Test edits to loaded or saved dicts don't leak into other readers"""
+    manager = LockManager(tmp_path / "locks.json")
+    manager.load_locks()["ghost.mcam"] = {"user": "mmclean"}
+    assert not manager.is_locked("ghost.mcam")
+
+    locks = {"1801811.mcam": {"user": "mmclean", "message": "Editing"}}
+    manager.save_locks(locks)
+    locks["ghost.mcam"] = {"user": "mmclean"}
+    assert not manager.is_locked("ghost.mcam")
+    assert manager.is_locked("1801811.mcam")
+
+
+def test_sqlite_acquire_reports_only_real_lock_conflicts(tmp_path):
+    """Test a rejected column value is not reported as a lock conflict"""
+    manager = SQLiteLockManager(tmp_path / "locks.db")
+    with pytest.raises(sqlite3.IntegrityError):
+        manager.acquire_lock("1801811.mcam", "mmclean", None)
+    assert not manager.is_locked("1801811.mcam")
+
+
+def test_list_files_callers_cannot_change_the_cache(tmp_path):
+    """Test editing a returned listing leaves later listings intact"""
+    repo = FileRepository(tmp_path / "repo")
+    repo.write_file("1801811.mcam", b"abc")
+    repo.list_files().clear()
+    assert [f.name for f in repo.list_files()] == ["1801811.mcam"]
+    repo.list_files().clear()
+    assert [f.name for f in repo.list_files()] == ["1801811.mcam"]
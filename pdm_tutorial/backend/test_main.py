@@ -1,15 +1,17 @@
 from fastapi.testclient import TestClient
-from backend.app.main import app
+from app.main import app
+from app.api.files import MOCK_FILES
+from app.schemas.files import FileListResponse
 
 # Create a test client
 client = TestClient(app)
 
 
 def test_read_root():
-    """Test the root endpoint"""
+    """Test the root endpoint serves the frontend"""
     response = client.get("/")
     assert response.status_code == 200
-    assert response.json() == {'message': "Hello from the PMD Backend"}
+    assert "text/html" in response.headers["content-type"]
 
 
 def test_get_files():
@@ -21,6 +23,13 @@ def test_get_files():
     assert len(data["files"]) > 0
 
 
+def test_get_files_matches_validated_model():
+    """Test the ORJSONResponse body matches the validated FileListResponse dump"""
+    response = client.get("/api/files")
+    expected = FileListResponse(files=MOCK_FILES, total=len(MOCK_FILES))
+    assert response.json() == expected.model_dump(mode="json")
+
+
 def test_get_file_not_found():
     """Test 404 for non-existent file"""
     response = client.get("/api/files/NONEXISTENT.mcam")
@@ -28,9 +37,9 @@ def test_get_file_not_found():
 
 
 def test_checkout_file():
-    """Test chckout endpoint"""
+    """Test the checkout placeholder endpoint (real logic comes in stage 3)"""
     response = client.post(
-        "/api/checkout",
+        "/api/files/checkout",
         json={
             "filename": "PN1001_OP1.mcam",
             "user": "mmclean",
@@ -38,5 +47,16 @@ def test_checkout_file():
         }
     )
     assert response.status_code == 200
-    data = response.json()
-    assert data["success"] == True
+    assert "message" in response.json()
+
+
+def test_get_file():
+    """Test a single file is returned with every FileInfo field"""
+    response = client.get("/api/files/4806148.mcam")
+    assert response.status_code == 200
+    assert response.json() == {
+        "name": "4806148.mcam",
+        "status": "checked_out",
+        "size_bytes": 2345678,
+        "locked_by": "mmclean"
+    }
@@ -1,5 +1,7 @@
 from app.main import app
+from app import main as main_module
 from fastapi.testclient import TestClient
+import os
 import tempfile
 
 
@@ -34,3 +36,29 @@ def test_get_files_returns_array():
 def test_integration_with_css():
     response = client.get("/")
     assert "/static/css/style.css" in response.text  # Verifies link in HTML
+
+
+def test_get_files_cache_invalidated_on_change(tmp_path, monkeypatch):
+    mock_repo = tmp_path / "repo"
+    mock_repo.mkdir()
+    (mock_repo / "1801811.mcam").touch()
+    monkeypatch.setattr(main_module, "REPO_PATH", str(mock_repo))
+
+    assert [f["name"] for f in client.get("/api/files").json()] == ["1801811.mcam"]
+
+    (mock_repo / "4800124.mcam").touch()
+    # Coarse filesystem timestamps can hide a quick change, so force a bump
+    mtime_ns = mock_repo.stat().st_mtime_ns + 1_000_000_000
+    os.utime(mock_repo, ns=(mtime_ns, mtime_ns))
+
+    names = sorted(f["name"] for f in client.get("/api/files").json())
+    assert names == ["1801811.mcam", "4800124.mcam"]
+
+
+def test_get_files_not_modified():
+    response = client.get("/api/files")
+    etag = response.headers["etag"]
+
+    response = client.get("/api/files", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""